@@ -1,92 +1,299 @@
 import numpy as np
 import itertools
 
+try:
+    import numba
+except ImportError:
+    numba = None
 
-np.random.seed(0)
+
+# Number of set bits for every byte value; used when np.bitwise_count (NumPy >= 2.0) is unavailable.
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    def _popcount(words):
+        return _POPCOUNT_TABLE[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def pack_bits_rows(M):
+    # Pack each row of a 0/1 matrix into np.uint64 words: bit k of word w holds column 64 * w + k.
+    M = np.asarray(M, dtype=np.uint8)
+    n_cols = M.shape[-1]
+    n_words = (n_cols + 63) // 64
+    padded = np.zeros(M.shape[:-1] + (64 * n_words,), dtype=np.uint8)
+    padded[..., :n_cols] = M
+    return np.packbits(padded, axis=-1, bitorder='little').view(np.uint64)
+
+
+def gf2_matmul(A_packed_rows, B_packed_cols):
+    # (A @ B) % 2 where A is packed by rows and B by columns (i.e. pack_bits_rows(B.T)).
+    # Each output bit is the parity of popcount(A[i] & B[j]), XOR-reduced across the packed words.
+    counts = _popcount(A_packed_rows[:, np.newaxis, :] & B_packed_cols[..., np.newaxis, :, :])
+    return np.bitwise_xor.reduce(counts, axis=-1) & 1
+
+
+def pack_bits_cols(M):
+    # Pack each column (the last two axes are (rows, columns)) into np.uint64 words.
+    return pack_bits_rows(np.swapaxes(M, -1, -2))
+
+
+def gf2_dot(A, B):
+    B = np.asarray(B)
+    if B.ndim == 1:
+        return gf2_dot(A, B[:, np.newaxis])[:, 0]
+    return gf2_matmul(pack_bits_rows(A), pack_bits_cols(B))
+
+
+def unpack_bits_rows(M_packed, n_cols):
+    # Inverse of pack_bits_rows.
+    return np.unpackbits(M_packed.view(np.uint8), axis=-1, count=n_cols, bitorder='little')
+
+
+def row_supports(A):
+    # Column indices of the 1s in each row of A.
+    return tuple(tuple(int(k) for k in np.flatnonzero(row)) for row in A)
+
+
+# Packed words per row handled at a time (4 KB per row), so that a block of every input and
+# output row stays in L1 cache while all output rows are computed from it.
+BLOCK_WORDS = 512
+
+
+def gf2_apply_rows(supports, B_packed_rows):
+    # (A @ B) % 2 for a fixed A given by row_supports(A), with B packed by rows (64 columns per word).
+    # Output row i is just the XOR of the rows of B picked by A[i], so no multiply or popcount is needed.
+    n_words = B_packed_rows.shape[-1]
+    out = np.zeros(B_packed_rows.shape[:-2] + (len(supports), n_words), dtype=np.uint64)
+    for start in range(0, n_words, BLOCK_WORDS):
+        block = slice(start, start + BLOCK_WORDS)
+        for i, support in enumerate(supports):
+            for k in support:
+                out[..., i, block] ^= B_packed_rows[..., k, block]
+    return out
+
+
+def build_syndrome_table(H):
+    # Syndrome read as a 3-bit integer -> one-hot error vector (row 0 = no error).
+    table = np.zeros((8, H.shape[1]), dtype=np.uint8)
+    table[4 * H[0] + 2 * H[1] + H[2], np.arange(H.shape[1])] = 1
+    return table
+
+
+# 4.14.1: Generator matrix for Hamming code
+G = np.array([
+    [1, 0, 1, 1],
+    [1, 1, 0, 1],
+    [0, 0, 0, 1],
+    [1, 1, 1, 0],
+    [0, 0, 1, 0],
+    [0, 1, 0, 0],
+    [1, 0, 0, 0]
+], dtype=np.uint8)
+
+# 4.14.3: R s.t. np.dot(R, G) % 2 == np.eye(4)
+R = np.array([
+    [0, 0, 0, 0, 0, 0, 1],
+    [0, 0, 0, 0, 0, 1, 0],
+    [0, 0, 0, 0, 1, 0, 0],
+    [0, 0, 1, 0, 0, 0, 0]
+], dtype=np.uint8)
+
+# 4.14.4: Parity check matrix, np.dot(H, G) % 2 == 0
+H = np.array([
+    [0, 0, 0, 1, 1, 1, 1],
+    [0, 1, 1, 0, 0, 1, 1],
+    [1, 0, 1, 0, 1, 0, 1]
+], dtype=np.uint8)
+
+# Row supports used by encode / correct / decode, built once at import time.
+G_SUPPORTS = row_supports(G)
+H_SUPPORTS = row_supports(H)
+R_SUPPORTS = row_supports(R)
+ERROR_TABLE = build_syndrome_table(H)
+# Column to flip for each syndrome value (-1: no error / no matching column).
+ERROR_COLUMNS = np.array([np.flatnonzero(row)[0] if row.any() else -1 for row in ERROR_TABLE])
+
+
+# Payloads wider than this many columns go to the numba kernels below (when numba is installed).
+# For smaller ones the numpy path is faster; note that the first numba call also pays for JIT
+# compilation, which cache=True keeps on disk for later runs.
+NUMBA_MIN_COLUMNS = 4096
+
+
+def _use_numba(n_words, use_numba):
+    if numba is None:
+        return False
+    if use_numba is None:
+        return 64 * n_words > NUMBA_MIN_COLUMNS
+    return use_numba
+
+
+def _as_batch(M, shape):
+    # View M broadcast to `shape` as (n_batch, n_rows, n_words), the layout the numba kernels take.
+    return np.broadcast_to(M, shape).reshape((-1,) + shape[-2:])
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _gf2_apply_rows_numba(A, B_packed_rows, out):
+        # gf2_apply_rows with the dense A, run in parallel over blocks of words.
+        n_batch, _, n_words = B_packed_rows.shape
+        for block in numba.prange((n_words + BLOCK_WORDS - 1) // BLOCK_WORDS):
+            for b in range(n_batch):
+                for i in range(A.shape[0]):
+                    for w in range(block * BLOCK_WORDS, min((block + 1) * BLOCK_WORDS, n_words)):
+                        word = np.uint64(0)
+                        for k in range(A.shape[1]):
+                            if A[i, k]:
+                                word ^= B_packed_rows[b, k, w]
+                        out[b, i, w] = word
+
+    @numba.njit(parallel=True, cache=True)
+    def _correct_numba(H, error_columns, mat_packed_rows, noise_packed_rows, out):
+        # correct() for one word of every codeword row at a time: noise, syndrome and fix stay in registers.
+        n_bits = H.shape[1]
+        n_batch, _, n_words = out.shape
+        for block in numba.prange((n_words + BLOCK_WORDS - 1) // BLOCK_WORDS):
+            for b in range(n_batch):
+                for w in range(block * BLOCK_WORDS, min((block + 1) * BLOCK_WORDS, n_words)):
+                    s0, s1, s2 = np.uint64(0), np.uint64(0), np.uint64(0)
+                    for i in range(n_bits):
+                        word = mat_packed_rows[b, i, w] ^ noise_packed_rows[b, i, w]
+                        out[b, i, w] = word
+                        if H[0, i]:
+                            s0 ^= word
+                        if H[1, i]:
+                            s1 ^= word
+                        if H[2, i]:
+                            s2 ^= word
+                    for syndrome in range(1, 8):
+                        column = error_columns[syndrome]
+                        if column < 0:
+                            continue
+                        match = ((s0 if syndrome & 4 else ~s0) & (s1 if syndrome & 2 else ~s1)
+                                 & (s2 if syndrome & 1 else ~s2))
+                        out[b, column, w] ^= match
+
+
+def _apply_fixed(A, supports, B_packed_rows, use_numba):
+    if not _use_numba(B_packed_rows.shape[-1], use_numba):
+        return gf2_apply_rows(supports, B_packed_rows)
+    shape = B_packed_rows.shape[:-2] + (A.shape[0], B_packed_rows.shape[-1])
+    out = np.empty(shape, dtype=np.uint64)
+    _gf2_apply_rows_numba(A, _as_batch(B_packed_rows, B_packed_rows.shape), out.reshape((-1,) + shape[-2:]))
+    return out
+
+
+def encode(P_packed_rows, use_numba=None):
+    # Messages packed by row ((..., 4, n_words) words) -> codewords packed by row.
+    return _apply_fixed(G, G_SUPPORTS, P_packed_rows, use_numba)
+
+
+def decode(C_packed_rows, use_numba=None):
+    # Codewords packed by row ((..., 7, n_words) words) -> messages packed by row.
+    return _apply_fixed(R, R_SUPPORTS, C_packed_rows, use_numba)
+
+
+def correct(mat_packed_rows, noise_packed_rows=None, use_numba=None, out=None):
+    # Codewords packed by row ((..., 7, n_words) words) -> corrected codewords in the same layout.
+    # If noise is given it is XORed in first; adding noise, the syndrome and the fix are done block by block
+    # so each word of the codeword is read from memory once.
+    # use_numba: None picks the numba kernel for payloads wider than NUMBA_MIN_COLUMNS.
+    # out: optional preallocated (C-contiguous) result array, so repeated calls can reuse one buffer.
+    shape = mat_packed_rows.shape
+    if noise_packed_rows is not None:
+        shape = np.broadcast_shapes(shape, noise_packed_rows.shape)
+    corrected = np.empty(shape, dtype=np.uint64) if out is None else out
+    if _use_numba(shape[-1], use_numba):
+        if noise_packed_rows is None:
+            noise_packed_rows = np.zeros(1, dtype=np.uint64)
+        _correct_numba(H, ERROR_COLUMNS, _as_batch(mat_packed_rows, shape), _as_batch(noise_packed_rows, shape),
+                       corrected.reshape((-1,) + shape[-2:]))
+        return corrected
+    for start in range(0, shape[-1], BLOCK_WORDS):
+        block = slice(start, start + BLOCK_WORDS)
+        # The block is corrected in place inside the result array.
+        received = corrected[..., block]
+        if noise_packed_rows is None:
+            received[...] = mat_packed_rows[..., block]
+        else:
+            np.bitwise_xor(mat_packed_rows[..., block], noise_packed_rows[..., block], out=received)
+        # Syndrome bits of 64 codewords per word; each syndrome value selects one column to flip via
+        # ERROR_COLUMNS, and its codewords are the AND of the matching syndrome rows (shared pairwise).
+        S = gf2_apply_rows(H_SUPPORTS, received)
+        S_inverted = ~S
+        pairs = [[S_inverted[..., 0, :] & S_inverted[..., 1, :], S_inverted[..., 0, :] & S[..., 1, :]],
+                 [S[..., 0, :] & S_inverted[..., 1, :], S[..., 0, :] & S[..., 1, :]]]
+        match = np.empty_like(S[..., 0, :])
+        for syndrome in range(1, 8):
+            column = ERROR_COLUMNS[syndrome]
+            if column < 0:
+                continue
+            last = S[..., 2, :] if syndrome & 1 else S_inverted[..., 2, :]
+            np.bitwise_and(pairs[syndrome >> 2][(syndrome >> 1) & 1], last, out=match)
+            received[..., column, :] ^= match
+    return corrected
 
 
 def main():
+    rng = np.random.default_rng(0)
+
     # 4.14.1
     print('4.14.1')
-    # Generator matrix for Hamming code
-    G = np.array([
-        [1, 0, 1, 1],
-        [1, 1, 0, 1],
-        [0, 0, 0, 1],
-        [1, 1, 1, 0],
-        [0, 0, 1, 0],
-        [0, 1, 0, 0],
-        [1, 0, 0, 0]
-    ])
 
     # 4.14.2
     print('4.14.2')
-    print(np.dot(G, np.array([1, 0, 0, 1])) % 2)
+    print(gf2_dot(G, np.array([1, 0, 0, 1], dtype=np.uint8)))
 
-    # 4.14.3: find R s.t. np.dot(R, G) % 2 == np.eye(4)
+    # 4.14.3
     print('4.14.3')
-    R = np.array([
-        [0, 0, 0, 0, 0, 0, 1],
-        [0, 0, 0, 0, 0, 1, 0],
-        [0, 0, 0, 0, 1, 0, 0],
-        [0, 0, 1, 0, 0, 0, 0]
-    ])
     for vec in itertools.product([0, 1], repeat=4):
         # Check whether decoding works well.
-        message = np.array(vec)
-        code = np.dot(G, message) % 2
-        decoded_message = np.dot(R, code) % 2
+        message = np.array(vec, dtype=np.uint8)
+        code = gf2_dot(G, message)
+        decoded_message = gf2_dot(R, code)
         print(message, code, decoded_message)
 
     # 4.14.4
     print('4.14.4')
-    H = np.array([
-        [0, 0, 0, 1, 1, 1, 1],
-        [0, 1, 1, 0, 0, 1, 1],
-        [1, 0, 1, 0, 1, 0, 1]
-    ])
-    print(np.dot(H, G) % 2)  # == np.zeros((3, 4))
+    print(gf2_dot(H, G))  # == np.zeros((3, 4))
 
     # 4.14.5
     print('4.14.5')
     def find_error(syndrome):
-        n_column = H.shape[1]
-        for column in range(n_column):
-            if np.all(H[:, column] == syndrome):
-                error = np.zeros(n_column, dtype=np.int)
-                error[column] = 1
-                return error
-        return np.zeros(n_column, dtype=np.int)
+        return ERROR_TABLE[4 * syndrome[0] + 2 * syndrome[1] + syndrome[2]]
 
     # 4.14.6
     print('4.14.6')
-    tilde_c = np.array([1, 0, 1, 1, 0, 1, 1])
-    syndrome = np.dot(H, tilde_c) % 2
+    tilde_c = np.array([1, 0, 1, 1, 0, 1, 1], dtype=np.uint8)
+    syndrome = gf2_dot(H, tilde_c)
     error = find_error(syndrome)
-    error_fixed_tilde_c = (tilde_c + error) % 2
+    error_fixed_tilde_c = tilde_c ^ error
     print(tilde_c, error_fixed_tilde_c)
 
     # 4.14.7
     print('4.14.7')
     def find_error_matrix(S):
-        return np.apply_along_axis(find_error, 0, S)
+        return find_error(S).T
     S = np.array([
         [0, 0, 1, 1],
         [0, 1, 0, 1],
         [1, 0, 0, 1],
-    ])
+    ], dtype=np.uint8)
     print(find_error_matrix(S))
 
     # 4.14.8
     print('4.14.8')
     def str2bits(input_str):
-        bits = [1 << i for i in range(8)]  # 1 byte = 8 bits
-        return [1 if ord(char) & b > 0 else 0 for char in input_str for b in bits]
+        # Lowest byte of each character (1 byte = 8 bits), least significant bit first
+        codes = np.frombuffer(input_str.encode('utf-32-le'), dtype=np.uint32).astype(np.uint8)
+        return np.unpackbits(codes, bitorder='little')
     def bits2str(input_bits):
-        bits = [1 << i for i in range(8)]
-        return ''.join(chr(
-            sum(b * ib for b, ib in zip(bits, input_bits[i:i+8]))
-        ) for i in range(0, len(input_bits), 8))
+        codes = np.packbits(np.asarray(input_bits, dtype=np.uint8), bitorder='little')
+        return codes.tobytes().decode('latin1')
     s = ''.join([chr(i) for i in range(256)])
     ss = bits2str(str2bits(s))
     print(s)
@@ -96,20 +303,16 @@ def main():
     print('4.14.9')
     def bits2mat(bits, n_rows=4, trans=False):
         n_cols = len(bits) // n_rows
-        mat = np.zeros((n_rows, n_cols), dtype=np.int)
-        for i in range(n_rows):
-            for j in range(n_cols):
-                if bits[n_rows * j + i] > 0:
-                    mat[i, j] = 1
+        bits = (np.asarray(bits)[:n_rows * n_cols] > 0).astype(np.uint8)
+        mat = bits.reshape(n_cols, n_rows).T  # column j holds bits[n_rows * j:n_rows * (j + 1)]
         if trans:
             mat = mat.T
         return mat
     def mat2bits(mat, trans=False):
-        n_rows, n_cols = mat.shape
         if trans:
-            return [mat[i, j] for i in range(n_rows) for j in range(n_cols)]
+            return mat.ravel()
         else:
-            return [mat[i, j] for j in range(n_cols) for i in range(n_rows)]
+            return mat.ravel(order='F')
     s = ''.join([chr(i) for i in range(256)])
     ss = bits2str(mat2bits(bits2mat(str2bits(s))))
     print(s)
@@ -123,39 +326,46 @@ def main():
     # 4.14.11
     print('4.14.11')
     error_rate = 0.02
-    E = np.random.choice([0, 1], P.shape, [1 - error_rate, error_rate])
-    P_TILDE = (P + E) % 2
+    E = (rng.random(P.shape, dtype=np.float32) < error_rate).astype(np.uint8)
+    P_TILDE = P ^ E
     decoded_message = bits2str(mat2bits(P_TILDE))
     print(decoded_message)  # non-readable message
 
     # 4.14.12
     print('4.14.12')
-    C = np.dot(G, P) % 2
+    # Codewords are kept packed by row: each uint64 word holds one bit of 64 codewords.
+    n_columns = P.shape[1]
+    C_PACKED = encode(pack_bits_rows(P))
 
     # 4.14.13
     print('4.14.13')
     error_rate = 0.02
-    C_TILDE = (C + np.random.choice([0, 1], C.shape, p=[1 - error_rate, error_rate])) % 2
-    decoded_message = bits2str(mat2bits(np.dot(R, C_TILDE) % 2))
+    C_TILDE = C_PACKED ^ pack_bits_rows(rng.random((G.shape[0], n_columns), dtype=np.float32) < error_rate)
+    decoded_message = bits2str(mat2bits(unpack_bits_rows(decode(C_TILDE), n_columns)))
     print(decoded_message)  # non-readable message
 
     # 4.14.14
     print('4.14.14')
-    def correct(mat):
-        return (mat + find_error_matrix(np.dot(H, mat) % 2)) % 2
+    # correct() is defined at module level and works on row-packed codewords.
 
     # 4.14.15
     print('4.14.15')
     C_CORRECTED = correct(C_TILDE)
-    decoded_message = bits2str(mat2bits(np.dot(R, C_CORRECTED) % 2))
+    decoded_message = bits2str(mat2bits(unpack_bits_rows(decode(C_CORRECTED), n_columns)))
     print(decoded_message)
 
     # 4.14.16
     print('4.14.16')
+    # The packed codeword C_PACKED is shared; only the noise differs per rate.
+    # Buffers are allocated once and reused for every rate.
+    uniform = np.empty((G.shape[0], n_columns), dtype=np.float32)
+    noise = np.empty((G.shape[0], n_columns), dtype=bool)
+    C_CORRECTED = np.empty_like(C_PACKED)
     for error_rate in [0.01, 0.02, 0.03, 0.04, 0.05]:
-        C_TILDE = (C + np.random.choice([0, 1], C.shape, p=[1 - error_rate, error_rate])) % 2
-        C_CORRECTED = correct(C_TILDE)
-        decoded_message = bits2str(mat2bits(np.dot(R, C_CORRECTED) % 2))
+        rng.random(out=uniform, dtype=np.float32)
+        np.less(uniform, error_rate, out=noise)
+        correct(C_PACKED, pack_bits_rows(noise), out=C_CORRECTED)
+        decoded_message = bits2str(mat2bits(unpack_bits_rows(decode(C_CORRECTED), n_columns)))
         print('[Result for error rate {}]: '.format(error_rate) + decoded_message)
 
 
@@ -1,6 +1,8 @@
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+import numpy as np
 import time
-from collections import defaultdict, deque
+from numba import njit, prange
 
 
 class Section:
@@ -15,6 +17,70 @@ class Section:
         return f'{self.from_station} ({self.from_time}) -> {self.to_station} ({self.to_time})'
 
 
+class Trains:
+    """
+    列車データ（区間ごとの情報を、項目ごとの配列にまとめて持つ）
+
+    列車 n の区間は、各配列の train_indptr[n]:train_indptr[n + 1] の範囲に走行順に並ぶ。
+
+    Attributes:
+        n_trains (int): 列車本数
+        train_indptr (numpy.ndarray): 各列車の区間の開始位置（shape: (n_trains + 1,), dtype: int32）
+        from_stations (numpy.ndarray): 各区間の乗車駅（shape: (n_sections,), dtype: int32）
+        to_stations (numpy.ndarray): 各区間の下車駅（shape: (n_sections,), dtype: int32）
+        from_times (numpy.ndarray): 各区間の乗車時刻（0時からの経過分）（shape: (n_sections,), dtype: int32）
+        to_times (numpy.ndarray): 各区間の下車時刻（0時からの経過分）（shape: (n_sections,), dtype: int32）
+    """
+
+    def __init__(self, train_indptr, from_stations, to_stations, from_times, to_times):
+        self.n_trains = len(train_indptr) - 1
+        self.train_indptr = np.asarray(train_indptr, dtype=np.int32)
+        self.from_stations = np.asarray(from_stations, dtype=np.int32)
+        self.to_stations = np.asarray(to_stations, dtype=np.int32)
+        self.from_times = np.asarray(from_times, dtype=np.int32)
+        self.to_times = np.asarray(to_times, dtype=np.int32)
+
+
+class Timetable:
+    """
+    時刻表データ（convert_to_timetable で生成される）
+
+    駅 f から各駅へ直近の列車で移動する場合の乗車・下車時刻は、現在時刻について階段状の関数になり、
+    値が変わるのは駅 f を列車が出発する時刻だけなので、その時刻（ブレークポイント）ごとに値を持つ。
+    乗車時刻は（移動できる場合）ブレークポイントの時刻そのものなので、下車時刻だけを持つ。
+    駅 f のブレークポイントは dep_times[dep_indptr[f]:dep_indptr[f + 1]] に昇順で並び、
+    各駅の末尾には番兵（時刻 max_time、どの駅へも移動できない）を置く。
+
+    Attributes:
+        n_stations (int): 駅数
+        max_time (int): 時刻の上限（移動できない場合の乗車・下車時刻として使う）
+        dep_indptr (numpy.ndarray): 各駅のブレークポイントの開始位置（shape: (n_stations + 1,), dtype: int32）
+        dep_times (numpy.ndarray): ブレークポイントの時刻（shape: (n_breakpoints,), dtype: int32）
+        to_times (numpy.ndarray): to_times[k, t] はブレークポイントkの時刻に乗車した場合の駅tへの下車時刻（shape: (n_breakpoints, n_stations), dtype: int32）
+    """
+
+    def __init__(self, max_time, dep_indptr, dep_times, to_times):
+        self.n_stations = len(dep_indptr) - 1
+        self.max_time = max_time
+        self.dep_indptr = dep_indptr
+        self.dep_times = dep_times
+        self.to_times = to_times
+
+    def lookup(self, from_station, dep_time):
+        """
+        現在時刻が dep_time（< max_time）の時に from_station から各駅まで直近の列車で移動する場合の乗車・下車時刻を返す
+
+        Returns:
+            from_times (numpy.ndarray): 各駅への乗車時刻（移動できない場合は max_time）
+            to_times (numpy.ndarray): 各駅への下車時刻（移動できない場合は max_time）
+        """
+        begin, end = self.dep_indptr[from_station], self.dep_indptr[from_station + 1]
+        k = begin + np.searchsorted(self.dep_times[begin:end], dep_time)
+        to_times = self.to_times[k]
+        from_times = np.where(to_times < self.max_time, self.dep_times[k], self.max_time)
+        return from_times, to_times
+
+
 def generate_sample_trains(
         n_stations=5,
         n_trains=10,
@@ -32,22 +98,62 @@ def generate_sample_trains(
         section_minutes (int): 1区間あたりの所要時間（分）
 
     Returns:
-        trains (list of list of `Section`): テスト用の列車データ
+        trains (`Trains`): テスト用の列車データ
+    """
+    # 各列車の区間を (列車, 区間) の2次元配列として作る（区間は起点側から順に並べる）
+    n_sections = n_stations - 1
+    base_times = first_time + np.arange(n_trains)[:, None] * train_interval
+    stations = np.broadcast_to(np.arange(n_sections), (n_trains, n_sections))
+    from_times = base_times + stations * section_minutes
+    to_times = from_times + section_minutes
+    # 奇数番目の列車は逆方向に走る
+    is_reversed = (np.arange(n_trains) % 2 != 0)[:, None]
+    from_stations = np.where(is_reversed, n_stations - 1 - stations, stations)
+    to_stations = np.where(is_reversed, n_stations - 2 - stations, stations + 1)
+    train_indptr = np.arange(n_trains + 1) * n_sections
+    return Trains(train_indptr, from_stations.ravel(), to_stations.ravel(), from_times.ravel(), to_times.ravel())
+
+
+@njit(cache=True)
+def _earliest_arrival(indptr, indices, next_target_time, n_stations, max_time):
+    """
+    (時刻, 駅) のグラフ上で、各ノードから各駅への最速到着時刻を求める関数（numbaでJITコンパイルする）
+    辺は必ず時刻が進む向きに張られている（グラフがDAGになっている）ので、時刻の遅いノードから順に1回走査すればよい
+    駅で待機する辺は持たず、同じ駅の次の target_time のノードを next_target_time から求めて辿る
+
+    Args:
+        indptr (numpy.ndarray): CSR形式の隣接リスト（列車での移動の辺のみ）における、各ノードの辺の開始位置
+        indices (numpy.ndarray): CSR形式の隣接リスト（列車での移動の辺のみ）における、各辺の行き先のノード
+        next_target_time (numpy.ndarray): next_target_time[t] は t 以降で最初の target_time（なければ max_time）
+        n_stations (int): 駅数
+        max_time (int): 時刻の上限（到達できない駅の到着時刻として使う）
+
+    Returns:
+        arrival (numpy.ndarray): arrival[node, s] はノードnode（時刻 * n_stations + 駅）から駅sへの最速到着時刻
+            （到達できない場合は max_time）
     """
-    trains = list()
-    for n in range(n_trains):
-        base_time = first_time + n * train_interval
-        direction = n % 2
-        path = list()
-        for from_station in range(n_stations - 1):
-            to_station = from_station + 1
-            from_time = base_time + from_station * section_minutes
-            to_time = base_time + to_station * section_minutes
-            if direction != 0:
-                from_station, to_station = n_stations - 1 - from_station, n_stations - 1 - to_station
-            path.append(Section(from_station, to_station, from_time, to_time))
-        trains.append(path)
-    return trains
+    n_nodes = indptr.shape[0] - 1
+    arrival = np.full((n_nodes, n_stations), max_time, dtype=np.int32)
+    # ノード番号の大きい順 = 時刻の遅い順に処理する
+    for node in range(n_nodes - 1, -1, -1):
+        node_time, station = node // n_stations, node % n_stations
+        # target_time 以外の時刻のノードには辺がなく、参照もされない
+        if next_target_time[node_time] != node_time:
+            continue
+        arrival[node, station] = node_time
+        # 同じ駅で次の target_time まで待機する場合
+        wait_time = next_target_time[node_time + 1]
+        if wait_time < max_time:
+            wait_node = wait_time * n_stations + station
+            for s in range(n_stations):
+                if arrival[wait_node, s] < arrival[node, s]:
+                    arrival[node, s] = arrival[wait_node, s]
+        for i in range(indptr[node], indptr[node + 1]):
+            next_node = indices[i]
+            for s in range(n_stations):
+                if arrival[next_node, s] < arrival[node, s]:
+                    arrival[node, s] = arrival[next_node, s]
+    return arrival
 
 
 def convert_to_timetable(trains):
@@ -55,66 +161,144 @@ def convert_to_timetable(trains):
     列車データを時刻表データに変換する関数
 
     Args:
-        trains (list of list of `Section`): 列車データ
+        trains (`Trains`): 列車データ
+
+    Returns:
+        timetable (`Timetable`): 時刻表データ
+    """
+    max_time = 1 + int(trains.to_times.max())
+    n_stations = len(np.unique(trains.to_stations))
+    # Step0: 次ステップの探索用に (時刻, 駅) についてのグラフを作成
+    #     ノード (時刻, 駅) は 時刻 * n_stations + 駅 という整数で表し、隣接リストはCSR形式（indptr, indices）で持つ
+    section_from_nodes = trains.from_times.astype(np.int64) * n_stations + trains.from_stations
+    section_to_nodes = trains.to_times.astype(np.int64) * n_stations + trains.to_stations
+    target_times = np.unique(np.concatenate([trains.from_times, trains.to_times]))
+    # 駅で待機する辺は張らずに、各時刻以降で最初の target_time を引けるようにしておく
+    next_target_time = np.full(max_time + 1, max_time, dtype=np.int32)
+    next_target_time[target_times] = target_times
+    np.minimum.accumulate(next_target_time[::-1], out=next_target_time[::-1])
+    n_nodes = max_time * n_stations
+    indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+    np.cumsum(np.bincount(section_from_nodes, minlength=n_nodes), out=indptr[1:])
+    indices = section_to_nodes[np.argsort(section_from_nodes, kind='stable')].astype(np.int32)
+    # Step1: 各駅の列車の出発時刻をブレークポイントとして、その時刻に乗車した場合の各駅への下車時刻を登録
+    #     各ノードから他の駅への最速到着時刻をまとめて求める。待機した後の列車に乗る場合も含まれるので、
+    #     ブレークポイントの間の時刻（次のブレークポイントまで待機して乗車する）について別途データを入れる必要はない。
+    arrival = _earliest_arrival(indptr, indices, next_target_time, n_stations, max_time)
+    section_nodes = np.unique(section_from_nodes)
+    section_stations, section_times = section_nodes % n_stations, section_nodes // n_stations
+    order = np.lexsort((section_times, section_stations))
+    section_nodes, section_stations, section_times = section_nodes[order], section_stations[order], section_times[order]
+    # 各駅のブレークポイントの末尾に番兵を1つずつ置く
+    dep_indptr = np.zeros(n_stations + 1, dtype=np.int32)
+    np.cumsum(np.bincount(section_stations, minlength=n_stations) + 1, out=dep_indptr[1:])
+    rows = np.arange(len(section_nodes)) + section_stations
+    dep_times = np.full(dep_indptr[-1], max_time, dtype=np.int32)
+    dep_times[rows] = section_times
+    to_times = np.full((dep_indptr[-1], n_stations), max_time, dtype=np.int32)
+    to_times[rows] = arrival[section_nodes]
+    to_times[rows, section_stations] = max_time
+    timetable = Timetable(max_time, dep_indptr, dep_times, to_times)
+    return timetable
+
+
+@njit(cache=True)
+def _lsb_hash(lsb):
+    """
+    2の冪 lsb（< 2**63）を、ビット位置ごとに異なる 0〜63 の値に写す関数（de Bruijn 列による完全ハッシュ）
+    """
+    return ((lsb * 0x03F79D71B4CB0A89) >> 58) & 63
+
+
+@njit(cache=True)
+def _search_breakpoint(dep_indptr, dep_times, station, current_time):
+    """
+    現在時刻が current_time（<= max_time）の時に駅 station から乗車する場合のブレークポイントの位置を二分探索で求める関数
+    """
+    begin, end = dep_indptr[station], dep_indptr[station + 1]
+    return begin + np.searchsorted(dep_times[begin:end], current_time)
+
+
+@njit(parallel=True, cache=True)
+def _bit_dp(dep_indptr, dep_times, to_times, max_time, start_station, stay_minutes):
+    """
+    bit dpの本体（numbaでJITコンパイルし、同じ層の状態を並列に計算する）
+
+    Args:
+        dep_indptr (numpy.ndarray): 時刻表データの各駅のブレークポイントの開始位置（`Timetable` の同名の属性）
+        dep_times (numpy.ndarray): 時刻表データのブレークポイントの時刻（`Timetable` の同名の属性）
+        to_times (numpy.ndarray): 時刻表データの下車時刻（`Timetable` の同名の属性）
+        max_time (int): 時刻の上限
+        start_station (int): 移動開始の駅（＝移動の最終目的駅）
+        stay_minutes (int): 各駅における滞在時間（分）
 
     Returns:
-        timetable (list): 時刻表データ
-            timetable[from_station][to_station][dep_time] = (from_time, to_time)
-            -> 現在時刻が dep_time の時に from_station から to_station まで直近の列車で移動する場合の
-               乗車・下車時刻（0時からの経過分）のタプル
+        dp (numpy.ndarray): dp[s * n_stations + n] は「駅集合s内の駅に全て訪問済み＆最後に訪問したのが駅n」の場合の最も早い到着時刻
+        parent_station (numpy.ndarray): dpの各状態における親の状態の駅（親がなければ -1）
+        parent_state (numpy.ndarray): dpの各状態における親の状態の駅集合（親がなければ -1）
     """
-    max_time = 1 + max([section.to_time for train in trains for section in train])
-    n_stations = len(set([section.to_station for train in trains for section in train]))
-    timetable = [[[(max_time, max_time) for _ in range(max_time)] for _ in range(n_stations)] for _ in range(n_stations)]
-    # Step0: 次ステップの探索用に (時刻, 駅) についてのグラフ（adj）を作成
-    adj = defaultdict(list)
-    target_time_flag = [0 for _ in range(max_time)]
-    for train in trains:
-        for section in train:
-            adj[(section.from_time, section.from_station)].append((section.to_time, section.to_station))
-            target_time_flag[section.from_time] = 1
-            target_time_flag[section.to_time] = 1
-    target_times = [t for t in range(max_time) if target_time_flag[t] == 1]
+    # 状態 (駅n, 駅集合s) は s * n_stations + n という1次元の位置で表す（同じ駅集合の状態が隣り合う）
+    n_stations = dep_indptr.shape[0] - 1
+    n_states = 1 << n_stations
+    dp = np.full(n_states * n_stations, max_time, dtype=np.int32)
+    parent_station = np.full(n_states * n_stations, -1, dtype=np.int32)
+    parent_state = np.full(n_states * n_stations, -1, dtype=np.int32)
+    # dep_index は各状態から stay_minutes 後に乗車する場合のブレークポイントの位置（乗車できなければ駅nの番兵）
+    # 状態ごとに1回だけ二分探索しておき、遷移のたびに探索しないようにする
+    dep_index = np.empty(n_states * n_stations, dtype=np.int32)
     for station in range(n_stations):
-        for from_time, to_time in zip(target_times[:-1], target_times[1:]):
-            adj[(from_time, station)].append((to_time, station))
-    # Step1: 出発時刻 = 乗車時刻 のデータを登録
-    for train in trains:
-        for section in train:
-            # 他の駅への最速到着時刻をBFSで求める
-            min_to_time = [max_time for _ in range(n_stations)]
-            min_to_time[section.from_station] = section.from_time
-            que = deque([(section.from_time, section.from_station)])
-            visited = defaultdict(int)
-            visited[(section.from_time, section.from_station)] = 1
-            while len(que) > 0:
-                from_time, from_station = que.popleft()
-                for to_time, to_station in adj[(from_time, from_station)]:
-                    if visited[(to_time, to_station)] == 1:
+        dep_index[station::n_stations] = dep_indptr[station + 1] - 1
+    dp[start_station] = 0
+    if stay_minutes < max_time:
+        dep_index[start_station] = _search_breakpoint(dep_indptr, dep_times, start_station, stay_minutes)
+    # 内側のループでは to_station を固定して from_station を動かすので、下車駅ごとに連続した配列にしておく
+    to_times_by_to_station = np.ascontiguousarray(to_times.T)
+    # 最下位ビット lsb（= 1 << station）から駅を引く表（de Bruijn 列を掛けた上位6ビットが station ごとに異なることを使う）
+    station_of_lsb = np.zeros(64, dtype=np.int32)
+    for station in range(n_stations):
+        station_of_lsb[_lsb_hash(1 << station)] = station
+    # 状態を訪問済みの駅数（popcount）の層ごとにまとめる
+    # 各状態は1つ少ない層の状態しか参照しないので、同じ層の状態は並列に計算できる（書き込む範囲も重ならない）
+    popcounts = np.zeros(n_states, dtype=np.int32)
+    for state in range(1, n_states):
+        popcounts[state] = popcounts[state >> 1] + (state & 1)
+    states_by_popcount = np.argsort(popcounts, kind='mergesort')
+    layer_indptr = np.zeros(n_stations + 2, dtype=np.int64)
+    layer_indptr[1:] = np.cumsum(np.bincount(popcounts, minlength=n_stations + 1))
+    for popcount in range(1, n_stations + 1):
+        for i in prange(layer_indptr[popcount], layer_indptr[popcount + 1]):
+            state = states_by_popcount[i]
+            # to_station: stateの中で最後に訪れた駅とする（stateの立っているビットだけを下位から順に列挙する）
+            to_bits = state
+            while to_bits:
+                to_lsb = to_bits & -to_bits
+                to_bits ^= to_lsb
+                to_station = station_of_lsb[_lsb_hash(to_lsb)]
+                min_to_time = max_time
+                min_parent_station, min_parent_state = -1, -1
+                from_state = state ^ to_lsb
+                from_base = from_state * n_stations
+                to_times_row = to_times_by_to_station[to_station]
+                # from_state が空のとき、到達済みなのは開始駅（dp[start_station]）だけ
+                from_bits = from_state if from_state != 0 else 1 << start_station
+                while from_bits:
+                    from_lsb = from_bits & -from_bits
+                    from_bits ^= from_lsb
+                    from_station = station_of_lsb[_lsb_hash(from_lsb)]
+                    if from_station == to_station:
                         continue
-                    min_to_time[to_station] = min(to_time, min_to_time[to_station])
-                    que.append((to_time, to_station))
-                    visited[(to_time, to_station)] = 1
-            # 出発時刻 = 乗車時刻 のデータを登録
-            for to_station in range(n_stations):
-                if to_station == section.from_station:
-                    continue
-                to_time = min_to_time[to_station]
-                if to_time == max_time:
-                    continue
-                timetable[section.from_station][to_station][section.from_time] = (section.from_time, to_time)
-    # Step2: 出発時刻 != 乗車時刻 のデータを登録
-    #     例えば駅1→2の始発列車を考え、5:00（300）発・5:05（305）着だとする。
-    #     step1では timetable[1][2][300] = (300, 305) とデータが登録される。
-    #     ここで駅1を5:00(300)より前に出発するとしても、駅1で待機して同じ列車に乗ることになるため、
-    #     t < 300 に対して timetable[1][2][t] = (300, 305) となるはず。
-    #     step1ではこのデータは入らないので、ここで入れる。
-    for t in range(max_time - 2, - 1, - 1):
-        for from_station in range(n_stations):
-            for to_station in range(n_stations):
-                timetable[from_station][to_station][t] = \
-                   min(timetable[from_station][to_station][t], timetable[from_station][to_station][t + 1])
-    return timetable
+                    to_time = to_times_row[dep_index[from_base + from_station]]
+                    if to_time < min_to_time:
+                        min_to_time = to_time
+                        min_parent_station, min_parent_state = from_station, from_state
+                index = state * n_stations + to_station
+                dp[index] = min_to_time
+                if min_to_time + stay_minutes < max_time:
+                    dep_index[index] = _search_breakpoint(
+                        dep_indptr, dep_times, to_station, min_to_time + stay_minutes)
+                parent_station[index] = min_parent_station
+                parent_state[index] = min_parent_state
+    return dp, parent_station, parent_state
 
 
 def find_optimal_route_by_bit_dp(timetable, start_station=0, stay_minutes=10):
@@ -122,75 +306,72 @@ def find_optimal_route_by_bit_dp(timetable, start_station=0, stay_minutes=10):
     bit dpで最適ルートを求める関数
 
     Args:
-        timetable (list): 時刻表データ（generate_sample_timetable で生成される形式）
+        timetable (`Timetable`): 時刻表データ（convert_to_timetable で生成される）
         start_station (int): 移動開始の駅（＝移動の最終目的駅）
         stay_minutes (int): 各駅における滞在時間（分）
 
     Returns:
         optimal_path (list of `Section`): 最適ルート
     """
-    n_stations = len(timetable)
-    max_time = len(timetable[0][0])
-    # dp[n][s]: 「駅集合s内の駅に全て訪問済み＆最後に訪問したのが駅n」の場合の最も早い到着時刻
-    dp = [[max_time for _ in range(1 << n_stations)] for _ in range(n_stations)]
-    # dpの各状態における親の状態（経路復元に利用）
-    parent = [[(None, None) for _ in range(1 << n_stations)] for _ in range(n_stations)]
-    # bit dp
-    dp[start_station][0] = 0
-    for state in range(1, 1 << n_stations):
-        for to_station in range(n_stations):
-            # to_station: stateの中で最後に訪れた駅とする（なので未訪問の場合はスルー）
-            if (state >> to_station) & 1 == 0:
-                continue
-            min_to_time = max_time
-            min_parent = (None, None)
-            from_state = state - (1 << to_station)
-            for from_station in range(n_stations):
-                if from_station == to_station:
-                    continue
-                if from_state != 0 and (from_state >> from_station) & 1 == 0:
-                    continue
-                current_time = dp[from_station][from_state]
-                current_time += stay_minutes
-                if current_time >= max_time:
-                    continue
-                _, to_time = timetable[from_station][to_station][current_time]
-                if to_time < min_to_time:
-                    min_to_time = to_time
-                    min_parent = (from_station, from_state)
-            dp[to_station][state] = min_to_time
-            parent[to_station][state] = min_parent
+    n_stations = timetable.n_stations
+    # DPでは下車時刻しか使わないので、その部分だけ渡す
+    dp, parent_station, parent_state = _bit_dp(
+        timetable.dep_indptr, timetable.dep_times, timetable.to_times, timetable.max_time, start_station, stay_minutes)
     # 経路復元
     optimal_path = list()
     to_station, to_state = start_station, (1 << n_stations) - 1
-    from_station, from_state = parent[to_station][to_state]
-    while from_station is not None:
-        current_time = dp[from_station][from_state] + stay_minutes
-        from_time, to_time = timetable[from_station][to_station][current_time]
+    index = to_state * n_stations + to_station
+    from_station, from_state = parent_station[index], parent_state[index]
+    while from_station != -1:
+        current_time = dp[from_state * n_stations + from_station] + stay_minutes
+        from_times, to_times = timetable.lookup(from_station, current_time)
+        from_time, to_time = from_times[to_station], to_times[to_station]
         optimal_path.append(Section(from_station, to_station, from_time, to_time))
         to_station, to_state = from_station, from_state
-        from_station, from_state = parent[to_station][to_state]
+        index = to_state * n_stations + to_station
+        from_station, from_state = parent_station[index], parent_state[index]
     optimal_path.reverse()
     return optimal_path
 
 
+def _to_segments(trains):
+    """
+    列車データ（または移動経路）を、描画用の線分（乗車中の線分と停車中の線分）に変換する関数
+
+    Args:
+        trains (`Trains`): 列車データ（移動経路の場合は1本の列車として扱う）
+
+    Returns:
+        segments (numpy.ndarray): 線分 [(時刻, 駅), (時刻, 駅)] の配列（shape: (n_segments, 2, 2)）
+    """
+    from_points = np.stack([trains.from_times, trains.from_stations], axis=-1)
+    to_points = np.stack([trains.to_times, trains.to_stations], axis=-1)
+    ride_segments = np.stack([from_points, to_points], axis=1)
+    # 停車中の線分は同じ列車内で連続する区間の間にだけ引く（次の列車の最初の区間とはつながない）
+    stop_segments = np.stack([to_points[:-1], from_points[1:]], axis=1)
+    is_same_train = np.ones(len(stop_segments), dtype=np.bool_)
+    is_same_train[trains.train_indptr[1:-1] - 1] = False
+    return np.concatenate([ride_segments, stop_segments[is_same_train]])
+
+
 def draw_diagram(trains, path=[]):
+    # 線分ごとに plt.plot を呼ぶと遅いので、LineCollection でまとめて描画する
+    ax = plt.gca()
     # 列車を図示
-    for train in trains:
-        for section in train:
-            plt.plot([section.from_time, section.to_time], [section.from_station, section.to_station],
-                     color='g', marker='o', markersize=3)
-        for section, next_section in zip(train[:-1], train[1:]):
-            plt.plot([section.to_time, next_section.from_time], [section.to_station, next_section.from_station],
-                     color='g', marker='o', markersize=3)
+    segments = _to_segments(trains)
+    ax.add_collection(LineCollection(segments, colors='g'))
+    points = segments.reshape(-1, 2)
+    ax.scatter(points[:, 0], points[:, 1], s=9, c='g')
     # （もしあれば）移動経路を重ねて図示
     if len(path) > 0:
-        for section in path:
-            plt.plot([section.from_time, section.to_time], [section.from_station, section.to_station],
-                     color='r', linewidth=3)
-        for section, next_section in zip(path[:-1], path[1:]):
-            plt.plot([section.to_time, next_section.from_time], [section.to_station, next_section.from_station],
-                     color='r', linewidth=3)
+        path_trains = Trains(
+            [0, len(path)],
+            [section.from_station for section in path],
+            [section.to_station for section in path],
+            [section.from_time for section in path],
+            [section.to_time for section in path])
+        ax.add_collection(LineCollection(_to_segments(path_trains), colors='r', linewidths=3))
+    ax.autoscale_view()
     plt.xlabel('time')
     plt.ylabel('station')
     plt.show()
@@ -235,7 +416,7 @@ def main():
 def generate_watarase_trains():
     """
     Returns:
-        trains (list of list of `Section`): わたらせ渓谷鉄道の列車データ(2020年冬)
+        trains (`Trains`): わたらせ渓谷鉄道の列車データ(2020年冬)
             https://www.watetsu.com/jikoku_torokko/201201_210331.pdf
             ・駅のインデックスは「桐生:0、…、間藤：16」とした
             ・臨時列車及び日光市営バスは利用しない前提
@@ -401,21 +582,17 @@ def generate_watarase_trains():
             'time': [2126,2128]
         }
     ]
-    # Sectionのlistのlistに変換
-    trains = list()
+    # 区間ごとの配列に変換（発着交互に並んでいるので、偶数番目が乗車・奇数番目が下車）
+    train_indptr = [0]
     for row in data:
         n = len(row['station'])
         assert n == len(row['time'])
         assert n % 2 == 0
-        train = list()
-        for i in range(n // 2):
-            from_station = row['station'][2 * i]
-            to_station = row['station'][2 * i + 1]
-            from_time = 60 * (row['time'][2 * i] // 100) + row['time'][2 * i] % 100
-            to_time = 60 * (row['time'][2 * i + 1] // 100) + row['time'][2 * i + 1] % 100
-            train.append(Section(from_station, to_station, from_time, to_time))
-        trains.append(train)
-    return trains
+        train_indptr.append(train_indptr[-1] + n // 2)
+    stations = np.concatenate([row['station'] for row in data])
+    times = np.concatenate([row['time'] for row in data])
+    times = 60 * (times // 100) + times % 100
+    return Trains(train_indptr, stations[0::2], stations[1::2], times[0::2], times[1::2])
 
 
 if __name__ == '__main__':